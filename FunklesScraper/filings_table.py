@@ -0,0 +1,396 @@
+# filings_table.py
+import os
+import sys
+import json
+import time
+import shutil
+import numpy as np
+from .paths import CACHE_DIR, FILINGS_TABLE_DIR
+
+TABLE_VERSION = 3
+NO_CODE = -1
+UNLABELED = "Unlabeled"
+
+# Column name -> dtype. Strings are stored as int32 codes into a vocabulary,
+# reporting persons as a flattened code array plus per-row offsets.
+COLUMNS = {
+    "filename": None,  # fixed-width utf-8 bytes, width depends on the data
+    "date": "datetime64[D]",
+    "share": "float64",
+    "cik": "int64",
+    "form": "int32",
+    "issuer": "int32",
+    "label": "int32",
+    "person_offsets": "int64",
+    "person_codes": "int32",
+}
+VOCABS = ("form", "issuer", "label", "person")
+
+# Snapshot layout: each save writes a new snapshot-* directory, then swaps
+# the CURRENT pointer to it. STALE is touched whenever a meta file changes.
+CURRENT_FILE = "CURRENT"
+STALE_FILE = "STALE"
+
+
+class _Vocabulary:
+    """
+    Interned string <-> int code mapping. Missing values map to NO_CODE.
+    """
+
+    def __init__(self, values=()):
+        self.values = [sys.intern(v) for v in values]
+        self.codes = {v: i for i, v in enumerate(self.values)}
+
+    def encode(self, value):
+        if not value:
+            return NO_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def lookup(self, value):
+        """
+        Code for an existing value, or None if it was never seen.
+        """
+        return self.codes.get(value)
+
+    def decode(self, code):
+        return self.values[code] if code != NO_CODE else None
+
+
+def _parse_date(value):
+    try:
+        return np.datetime64(value, "D")
+    except Exception:
+        return np.datetime64("NaT", "D")
+
+
+class FilingsTable:
+    """
+    Compact columnar view of the filing cache.
+
+    Every column is a NumPy array indexed by row, so filtering, sorting and
+    aggregation are vectorized. Summaries are not kept in memory; they are
+    read from the filing's meta file when asked for.
+    """
+
+    def __init__(self, columns, vocabs, cache_dir=CACHE_DIR, source_mtime=0.0, built_at=0.0):
+        self.columns = columns
+        self.vocabs = vocabs
+        self.cache_dir = cache_dir
+        self.source_mtime = source_mtime
+        self.built_at = built_at
+
+    def __len__(self):
+        return len(self.columns["date"])
+
+    # ------------------------
+    # Build / persistence
+    # ------------------------
+    @classmethod
+    def from_cache(cls, cache_dir=CACHE_DIR):
+        vocabs = {name: _Vocabulary() for name in VOCABS}
+        filenames, dates, shares, ciks = [], [], [], []
+        forms, issuers, labels = [], [], []
+        person_offsets, person_codes = [0], []
+        built_at = time.time()
+        source_mtime = os.stat(cache_dir).st_mtime
+
+        for root, dirs, files in os.walk(cache_dir):
+            for file in files:
+                if not file.endswith(".meta.json"):
+                    continue
+                try:
+                    with open(os.path.join(root, file), "r") as f:
+                        meta = json.load(f)
+                    if not meta or not meta.get("filename"):
+                        continue
+                    # Extract the whole row before appending so a bad field
+                    # skips the file instead of leaving the columns misaligned
+                    filename = meta["filename"].encode("utf-8")
+                    date = _parse_date(meta.get("date"))
+                    share = meta.get("share %")
+                    share = float(share) if share is not None else np.nan
+                    cik = meta.get("cik")
+                    cik = int(cik) if cik and str(cik).isdigit() else 0
+                    label = meta.get("label")
+                    # A literal "Unlabeled" label is the same as no label
+                    strings = [meta.get("form"), meta.get("issuer"), None if label == UNLABELED else label]
+                    names = [p for p in meta.get("reporting_persons") or [] if p]
+                    if any(v is not None and not isinstance(v, str) for v in strings + names):
+                        raise TypeError("form, issuer, label and reporting persons must be strings")
+                    form, issuer, label = (vocabs[v].encode(value) for v, value in zip(VOCABS, strings))
+                    persons = [vocabs["person"].encode(p) for p in names]
+                except Exception as e:
+                    print(f"Failed to load {file}: {e}")
+                    continue
+
+                filenames.append(filename)
+                dates.append(date)
+                shares.append(share)
+                ciks.append(cik)
+                forms.append(form)
+                issuers.append(issuer)
+                labels.append(label)
+                person_codes.extend(persons)
+                person_offsets.append(len(person_codes))
+
+        columns = {
+            "filename": np.array(filenames, dtype=bytes) if filenames else np.array([], dtype="S1"),
+            "date": np.array(dates, dtype=COLUMNS["date"]),
+            "share": np.array(shares, dtype=COLUMNS["share"]),
+            "cik": np.array(ciks, dtype=COLUMNS["cik"]),
+            "form": np.array(forms, dtype=COLUMNS["form"]),
+            "issuer": np.array(issuers, dtype=COLUMNS["issuer"]),
+            "label": np.array(labels, dtype=COLUMNS["label"]),
+            "person_offsets": np.array(person_offsets, dtype=COLUMNS["person_offsets"]),
+            "person_codes": np.array(person_codes, dtype=COLUMNS["person_codes"]),
+        }
+        return cls(columns, vocabs, cache_dir, source_mtime, built_at)
+
+    @classmethod
+    def load(cls, path=FILINGS_TABLE_DIR, cache_dir=CACHE_DIR):
+        """
+        Open the current snapshot written by save(). Columns are memory-mapped,
+        so only the pages a query touches are read from disk.
+        """
+        with open(os.path.join(path, CURRENT_FILE), "r") as f:
+            snapshot_dir = os.path.join(path, f.read().strip())
+        with open(os.path.join(snapshot_dir, "table.json"), "r") as f:
+            header = json.load(f)
+        if header.get("version") != TABLE_VERSION:
+            raise ValueError(f"Unsupported filings table version: {header.get('version')}")
+        columns = {
+            name: np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode="r")
+            for name in COLUMNS
+        }
+        if len(columns["date"]) != header["rows"]:
+            raise ValueError("Filings table snapshot is incomplete")
+        vocabs = {name: _Vocabulary(header["vocabs"][name]) for name in VOCABS}
+        return cls(columns, vocabs, cache_dir, header["source_mtime"], header["built_at"])
+
+    def save(self, path=FILINGS_TABLE_DIR):
+        """
+        Write a complete snapshot to a fresh directory and only then point
+        CURRENT at it, so readers see either the old or the new snapshot and
+        files still memory-mapped by an open table are never overwritten.
+        """
+        os.makedirs(path, exist_ok=True)
+        name = f"snapshot-{time.time_ns()}"
+        snapshot_dir = os.path.join(path, name)
+        os.makedirs(snapshot_dir)
+        try:
+            for column in COLUMNS:
+                np.save(os.path.join(snapshot_dir, f"{column}.npy"), np.asarray(self.columns[column]))
+            header = {
+                "version": TABLE_VERSION,
+                "rows": len(self),
+                "source_mtime": self.source_mtime,
+                "built_at": self.built_at,
+                "vocabs": {vocab: self.vocabs[vocab].values for vocab in VOCABS},
+            }
+            with open(os.path.join(snapshot_dir, "table.json"), "w") as f:
+                json.dump(header, f)
+            tmp_path = os.path.join(path, CURRENT_FILE + ".tmp")
+            with open(tmp_path, "w") as f:
+                f.write(name)
+            os.replace(tmp_path, os.path.join(path, CURRENT_FILE))
+        except Exception:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+            raise
+
+        # Old snapshots may still be mapped (Windows refuses to delete those);
+        # whatever is left over is retried on the next save.
+        for entry in os.listdir(path):
+            if entry.startswith("snapshot-") and entry != name:
+                shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+
+    # ------------------------
+    # Row access
+    # ------------------------
+    @property
+    def labels(self):
+        return list(self.vocabs["label"].values)
+
+    def filename(self, row):
+        return self.columns["filename"][row].decode("utf-8")
+
+    def date(self, row):
+        date = self.columns["date"][row]
+        return str(date) if not np.isnat(date) else ""
+
+    def reporting_persons(self, row):
+        offsets = self.columns["person_offsets"]
+        codes = self.columns["person_codes"][offsets[row]:offsets[row + 1]]
+        return [self.vocabs["person"].decode(c) for c in codes]
+
+    def record(self, row):
+        """
+        Meta-style dict for one row (without the summary).
+        """
+        share = self.columns["share"][row]
+        cik = int(self.columns["cik"][row])
+        return {
+            "filename": self.filename(row),
+            "date": self.date(row),
+            "form": self.vocabs["form"].decode(self.columns["form"][row]),
+            "issuer": self.vocabs["issuer"].decode(self.columns["issuer"][row]),
+            "reporting_persons": self.reporting_persons(row),
+            "cik": str(cik).zfill(10) if cik else None,
+            "label": self.vocabs["label"].decode(self.columns["label"][row]),
+            "share %": float(share) if not np.isnan(share) else None,
+        }
+
+    def summary(self, row):
+        """
+        Load the summary for one row from its meta file.
+        """
+        meta_path = os.path.join(self.cache_dir, f"{self.filename(row)}.meta.json")
+        try:
+            with open(meta_path, "r") as f:
+                return json.load(f).get("summary")
+        except Exception as e:
+            print(f"Failed to load summary from {meta_path}: {e}")
+            return None
+
+    # ------------------------
+    # Vectorized queries
+    # ------------------------
+    def filter(self, label=None, form=None, cik=None, start=None, end=None, min_share=None):
+        """
+        Row indices matching every given condition. `label` may be UNLABELED
+        to select filings without a label; dates are inclusive.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in (("label", label), ("form", form)):
+            if value is None:
+                continue
+            if name == "label" and value == UNLABELED:
+                code = NO_CODE
+            else:
+                code = self.vocabs[name].lookup(value)
+                if code is None:
+                    return np.array([], dtype=np.int64)
+            mask &= self.columns[name] == code
+        if cik is not None:
+            mask &= self.columns["cik"] == int(cik)
+        if start is not None:
+            mask &= self.columns["date"] >= np.datetime64(start, "D")
+        if end is not None:
+            mask &= self.columns["date"] <= np.datetime64(end, "D")
+        if min_share is not None:
+            mask &= self.columns["share"] >= min_share  # NaN never matches
+        return np.flatnonzero(mask)
+
+    def sort(self, rows=None, by="date", descending=False):
+        """
+        Row indices ordered by a column. Ties keep their original order and
+        missing dates / shares always sort last.
+        """
+        if rows is None:
+            rows = np.arange(len(self))
+        values = self.columns[by][rows]
+        if descending:
+            # Stable sort of the reversed values, flipped back, keeps ties in order
+            order = len(values) - 1 - np.argsort(values[::-1], kind="stable")[::-1]
+            if values.dtype.kind in "fM":
+                missing = np.isnan(values[order]) if values.dtype.kind == "f" else np.isnat(values[order])
+                order = np.concatenate([order[~missing], order[missing]])
+        else:
+            order = np.argsort(values, kind="stable")
+        return rows[order]
+
+    def group_sum(self, keys, value="share", rows=None):
+        """
+        Sum `value` over groups of the given key columns (names or arrays
+        aligned with `rows`). Rows with a missing value are skipped.
+        Returns (list of key arrays, totals).
+        """
+        if rows is None:
+            rows = np.arange(len(self))
+        values = self.columns[value][rows]
+        keep = ~np.isnan(values)
+        key_arrays = [
+            (self.columns[k][rows] if isinstance(k, str) else np.asarray(k))[keep]
+            for k in keys
+        ]
+        values = values[keep]
+        if len(values) == 0:
+            return [k[:0] for k in key_arrays], values
+
+        order = np.lexsort(key_arrays[::-1])
+        key_arrays = [k[order] for k in key_arrays]
+        boundary = np.zeros(len(values), dtype=bool)
+        boundary[0] = True
+        for k in key_arrays:
+            boundary[1:] |= k[1:] != k[:-1]
+        starts = np.flatnonzero(boundary)
+        totals = np.add.reduceat(values[order], starts)
+        return [k[starts] for k in key_arrays], totals
+
+    def stake_by_issuer_week(self, rows=None):
+        """
+        Total disclosed stake (sum of share %) per issuer CIK per week.
+        Weeks start on Monday. Returns (ciks, week_starts, totals).
+        """
+        if rows is None:
+            rows = np.arange(len(self))
+        rows = rows[(self.columns["cik"][rows] != 0) & ~np.isnat(self.columns["date"][rows])]
+        dates = self.columns["date"][rows]
+        # 1970-01-01 was a Thursday, so day + 3 is 0 on Mondays
+        weeks = dates - ((dates.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+        (ciks, week_starts), totals = self.group_sum(["cik", weeks], rows=rows)
+        return ciks, week_starts, totals
+
+
+def build_filings_table(cache_dir=CACHE_DIR, path=FILINGS_TABLE_DIR):
+    """
+    Rebuild the table from the meta files and write a fresh snapshot.
+    """
+    table = FilingsTable.from_cache(cache_dir)
+    try:
+        table.save(path)
+    except Exception as e:
+        print(f"Failed to save filings table snapshot: {e}")
+    return table
+
+
+def mark_filings_table_stale(path=FILINGS_TABLE_DIR):
+    """
+    Flag the snapshot as out of date. Call after rewriting a meta file in
+    place, which does not change the cache directory's mtime.
+    """
+    try:
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, STALE_FILE), "a"):
+            pass
+        os.utime(os.path.join(path, STALE_FILE))
+    except Exception as e:
+        print(f"Failed to mark filings table stale: {e}")
+
+
+def _is_fresh(table, cache_dir, path):
+    if table.source_mtime < os.stat(cache_dir).st_mtime:
+        return False  # files were added to or removed from the cache
+    stale_path = os.path.join(path, STALE_FILE)
+    return not os.path.exists(stale_path) or os.stat(stale_path).st_mtime < table.built_at
+
+
+def load_filings_table(cache_dir=CACHE_DIR, path=FILINGS_TABLE_DIR):
+    """
+    Open the snapshot if it is still current, otherwise rebuild it.
+    """
+    try:
+        table = FilingsTable.load(path, cache_dir)
+        if _is_fresh(table, cache_dir, path):
+            return table
+        del table  # release the mapped columns before rebuilding
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Failed to load filings table snapshot, rebuilding: {e}")
+    return build_filings_table(cache_dir, path)
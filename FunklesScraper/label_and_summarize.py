@@ -1,5 +1,6 @@
 # label_and_summarize.py
 from .paths import ENV_PATH, CACHE_DIR, LABEL_PATH
+from .filings_table import mark_filings_table_stale
 
 class Labeler:
     def __init__(self):
@@ -126,3 +127,4 @@ class Labeler:
                     print(f"Generated summary for {meta['filename']}")
                     with open(meta_path, "w") as f:
                         json.dump(meta, f, indent=4)
+                    mark_filings_table_stale()
@@ -0,0 +1,258 @@
+# ownership.py
+import os
+import re
+import json
+from bisect import bisect_left, insort
+from .paths import CACHE_DIR, OWNERSHIP_INDEX_PATH
+
+INDEX_VERSION = 2
+
+# Spelled-out entity suffixes folded to their abbreviation
+ENTITY_SUFFIXES = {
+    "limited": "ltd",
+    "incorporated": "inc",
+    "corporation": "corp",
+    "company": "co",
+}
+
+
+def _migrate_v1(data):
+    # v2 changed normalize_person; person keys are rebuilt on load, so the
+    # stored records carry over unchanged.
+    return dict(data, version=2)
+
+
+# Upgrades from an older on-disk version to the next one, keyed by the old
+# version. Each takes and returns the loaded JSON dict.
+MIGRATIONS = {1: _migrate_v1}
+
+
+def normalize_person(name: str) -> str:
+    """
+    Normalize a reporting person name so spelling variants share one key.
+    Case, punctuation and repeated whitespace are ignored, and spelled-out
+    entity suffixes are folded ("Fund Y, L.P." == "FUND Y LP",
+    "Acme Limited" == "Acme Ltd.").
+    """
+    name = re.sub(r"[^\w\s]", "", (name or "").casefold())
+    words = name.split()
+    if words and words[-1] in ENTITY_SUFFIXES:
+        words[-1] = ENTITY_SUFFIXES[words[-1]]
+    return " ".join(words)
+
+
+def _stake_record(meta):
+    return {
+        "filename": meta["filename"],
+        "date": meta.get("date") or "",
+        "form": meta.get("form"),
+        "cik": meta.get("cik"),
+        "issuer": meta.get("issuer"),
+        "reporting_persons": meta.get("reporting_persons") or [],
+        "share %": meta.get("share %"),
+    }
+
+
+class OwnershipIndex:
+    """
+    Persistent ownership graph built from the filing cache. Records outlive
+    the cache window, so history accumulates across scrapes.
+
+    Filings are stored once by filename; adjacency lists keyed by issuer CIK
+    and by normalized reporting person hold (date, filename) pairs in time
+    order, so holder / stake history lookups never touch the meta files.
+    """
+
+    def __init__(self, path=OWNERSHIP_INDEX_PATH):
+        self.path = path
+        self.filings = {}
+        self.by_issuer = {}
+        self.by_person = {}
+        self.person_names = {}
+
+    # ------------------------
+    # Persistence
+    # ------------------------
+    @classmethod
+    def load(cls, path=OWNERSHIP_INDEX_PATH):
+        """
+        Load the index from disk, upgrading older versions. The index is the
+        only copy of filings aged out of the cache, so a file that cannot be
+        read is moved aside to `<path>.bad[.N]` rather than overwritten.
+        """
+        index = cls(path)
+        if not os.path.exists(path):
+            return index
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            version = data.get("version")
+            while version in MIGRATIONS:
+                data = MIGRATIONS[version](data)
+                version = data.get("version")
+            if version != INDEX_VERSION:
+                raise ValueError(f"Unsupported ownership index version: {version}")
+            for record in data.get("filings", {}).values():
+                index._link(record, ordered=False)
+            # Bulk load: sort each adjacency list once instead of per insert
+            for adjacency in (index.by_issuer, index.by_person):
+                for entries in adjacency.values():
+                    entries.sort()
+        except Exception as e:
+            bad_path, n = path + ".bad", 1
+            while os.path.exists(bad_path):
+                bad_path, n = f"{path}.bad.{n}", n + 1
+            print(f"Failed to load ownership index, moved to {bad_path} and rebuilding: {e}")
+            try:
+                os.replace(path, bad_path)
+            except OSError as move_error:
+                print(f"Failed to move ownership index aside: {move_error}")
+                raise e
+            index = cls(path)
+        return index
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "filings": self.filings}, f)
+        os.replace(tmp_path, self.path)
+
+    # ------------------------
+    # Updates
+    # ------------------------
+    def add(self, meta):
+        """
+        Index (or re-index) a single filing meta dict.
+        """
+        if not meta or not meta.get("filename"):
+            return
+        self.remove(meta["filename"])
+        self._link(_stake_record(meta))
+
+    def remove(self, filename):
+        record = self.filings.pop(filename, None)
+        if record is None:
+            return
+        key = (record["date"], filename)
+        self._unlink(self.by_issuer, record["cik"], key)
+        for person in {normalize_person(p) for p in record["reporting_persons"]}:
+            self._unlink(self.by_person, person, key)
+            if person not in self.by_person:
+                self.person_names.pop(person, None)
+
+    def sync(self, cache_dir=CACHE_DIR, prune=False):
+        """
+        Read meta files that are not yet indexed. Filings whose meta file is
+        gone (e.g. aged out by the scrape cleanup) stay in the index so stake
+        history is kept; pass prune=True to drop them.
+        Returns (added, removed).
+        """
+        seen = set()
+        added = 0
+        for root, dirs, files in os.walk(cache_dir):
+            for file in files:
+                if not file.endswith(".meta.json"):
+                    continue
+                filename = file[:-len(".meta.json")]
+                seen.add(filename)
+                if filename in self.filings:
+                    continue
+                try:
+                    with open(os.path.join(root, file), "r") as f:
+                        meta = json.load(f)
+                except Exception as e:
+                    print(f"Failed to index {file}: {e}")
+                    continue
+                if meta:
+                    self.add(meta)
+                    added += 1
+
+        if not prune:
+            return added, 0
+        stale = [name for name in self.filings if name not in seen]
+        for filename in stale:
+            self.remove(filename)
+        return added, len(stale)
+
+    # ------------------------
+    # Queries
+    # ------------------------
+    def holders(self, cik, min_share=None):
+        """
+        Stake history for an issuer CIK, oldest filing first.
+        With min_share, only filings at or above that fraction (0.05 == 5%).
+        """
+        cik = str(cik).strip().zfill(10)
+        return self._history(self.by_issuer.get(cik, []), min_share)
+
+    def stakes(self, person, min_share=None):
+        """
+        Stake history for a reporting person, oldest filing first.
+        With min_share, only filings at or above that fraction (0.05 == 5%).
+        """
+        return self._history(self.by_person.get(normalize_person(person), []), min_share)
+
+    def issuers_for(self, person, min_share=None):
+        """
+        Issuers a reporting person has filed on, mapped CIK -> issuer name,
+        in the order they first reached min_share.
+        """
+        return {r["cik"]: r["issuer"] for r in self.stakes(person, min_share)}
+
+    def find_persons(self, text):
+        """
+        Reporting person names whose normalized form contains `text`.
+        """
+        needle = normalize_person(text)
+        return sorted(name for key, name in self.person_names.items() if needle in key)
+
+    # ------------------------
+    # Internals
+    # ------------------------
+    def _history(self, entries, min_share):
+        records = [self.filings[name] for _, name in entries]
+        if min_share is not None:
+            records = [r for r in records if r["share %"] is not None and r["share %"] >= min_share]
+        return records
+
+    def _link(self, record, ordered=True):
+        place = insort if ordered else list.append
+        filename = record["filename"]
+        key = (record["date"], filename)
+        self.filings[filename] = record
+        if record["cik"]:
+            place(self.by_issuer.setdefault(record["cik"], []), key)
+        persons = {}
+        for name in record["reporting_persons"]:
+            persons.setdefault(normalize_person(name), name)
+        persons.pop("", None)
+        for person, name in persons.items():
+            place(self.by_person.setdefault(person, []), key)
+            self.person_names.setdefault(person, name)
+
+    @staticmethod
+    def _unlink(adjacency, node, key):
+        entries = adjacency.get(node)
+        if entries is None:
+            return
+        i = bisect_left(entries, key)
+        if i < len(entries) and entries[i] == key:
+            del entries[i]
+        if not entries:
+            del adjacency[node]
+
+
+def update_ownership_index(metas=None, cache_dir=CACHE_DIR, prune=False):
+    """
+    Load the persisted index, sync it with the cache and save it back.
+    Meta dicts passed in `metas` are re-indexed even if already known
+    (e.g. a filing that was downloaded again).
+    """
+    index = OwnershipIndex.load()
+    for meta in metas or []:
+        index.add(meta)
+    added, removed = index.sync(cache_dir, prune)
+    if metas or added or removed or not os.path.exists(index.path):
+        index.save()
+    print(f"Ownership index updated: {added} added, {removed} removed.")
+    return index
@@ -6,5 +6,7 @@ ENV_PATH = os.path.join(PROJECT_ROOT, ".env")
 SETTINGS_PATH = os.path.join(PROJECT_ROOT, "settings.json")
 LABEL_PATH = os.path.join(PROJECT_ROOT, "labels.txt")
 CACHE_DIR = os.path.join(PROJECT_ROOT, "filings_cache")
+OWNERSHIP_INDEX_PATH = os.path.join(PROJECT_ROOT, "ownership_index.json")
+FILINGS_TABLE_DIR = os.path.join(PROJECT_ROOT, "filings_table")
 
 os.makedirs(CACHE_DIR, exist_ok=True)
\ No newline at end of file
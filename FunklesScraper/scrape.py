@@ -6,6 +6,8 @@ from datamule import Index
 import xml.etree.ElementTree as ET
 from .scrape_utils import get_outstanding_shares, HEADERS
 from .paths import CACHE_DIR
+from .ownership import update_ownership_index
+from .filings_table import mark_filings_table_stale
 
 def scrape(form_type, days):
     try:
@@ -37,6 +39,7 @@ def scrape(form_type, days):
         print("No filings found.")
         return "No filings found."
 
+    saved_metas = []
     for result in results:
         try:
             sec_id = result["_id"]
@@ -120,6 +123,8 @@ def scrape(form_type, days):
             meta_path = os.path.join(CACHE_DIR, f"{safe_filename}.meta.json")
             with open(meta_path, "w") as f:
                 json.dump(meta, f, indent=4)
+            saved_metas.append(meta)
+            mark_filings_table_stale()
 
             print(f"Downloaded {safe_filename} from SEC")
 
@@ -144,4 +149,10 @@ def scrape(form_type, days):
                 except Exception as e:
                     print(f"Error cleaning up {file}: {e}")
 
+    # Keep the ownership index in step with the cache
+    try:
+        update_ownership_index(saved_metas)
+    except Exception as e:
+        print(f"Error updating ownership index: {e}")
+
     return f'Scrape Successful. {result_count} saved to filing cache, {files_removed} old files removed.'
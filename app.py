@@ -1,20 +1,21 @@
 # app.py
-import os
 import sys
 import json
 import traceback
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QComboBox,
-    QSpinBox, QPushButton, QTextEdit, QLabel, QListWidget, QTabWidget,
+    QSpinBox, QPushButton, QTextEdit, QLabel, QListView, QTabWidget,
     QSplitter, QSizePolicy, QLineEdit
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QAbstractListModel, QModelIndex
 from PyQt6.QtGui import QFont
 
-from FunklesScraper.paths import CACHE_DIR, SETTINGS_PATH
+from FunklesScraper.paths import SETTINGS_PATH
 from FunklesScraper.scrape import scrape
 from FunklesScraper.label_and_summarize import Labeler
 from FunklesScraper.chat import talk
+from FunklesScraper.ownership import OwnershipIndex, update_ownership_index
+from FunklesScraper.filings_table import load_filings_table, build_filings_table, UNLABELED
 
 # ----------------------------
 # Utility: redirect print() to QTextEdit
@@ -35,7 +36,8 @@ class EmittingStream(QWidget):
 # Worker for scraping + labeling
 # ----------------------------
 class ScrapeLabelWorker(QThread):
-    finished_signal = pyqtSignal(str)
+    # result message, rebuilt FilingsTable, reloaded OwnershipIndex
+    finished_signal = pyqtSignal(str, object, object)
     error_signal = pyqtSignal(str)
 
     def __init__(self, form_type, days):
@@ -48,7 +50,10 @@ class ScrapeLabelWorker(QThread):
             result = scrape(self.form_type, self.days)
             labeler = Labeler()
             labeler.run()
-            self.finished_signal.emit(result)
+            # Heavy reloads happen here so the GUI thread only swaps them in
+            table = build_filings_table()
+            index = OwnershipIndex.load()
+            self.finished_signal.emit(result, table, index)
         except Exception:
             self.error_signal.emit(traceback.format_exc())
 
@@ -67,23 +72,50 @@ except Exception:
     }
 
 # ----------------------------
-# Load filings metadata
+# Load filings table (columnar, memory-mapped snapshot)
 # ----------------------------
-def load_filings():
-    filings_list = []
-    for root, dirs, files in os.walk(CACHE_DIR):
-        for file in files:
-            if file.endswith(".meta.json"):
-                try:
-                    with open(os.path.join(root, file), "r") as f:
-                        data = json.load(f)
-                        if data:  # skip None
-                            filings_list.append(data)
-                except Exception as e:
-                    print(f"Failed to load {file}: {e}")
-    return filings_list
-
-filings = load_filings()
+filings_table = load_filings_table()
+
+# ----------------------------
+# Filings list model (reads rows from the table lazily)
+# ----------------------------
+class FilingsListModel(QAbstractListModel):
+    BATCH_SIZE = 1000
+
+    def __init__(self):
+        super().__init__()
+        self.table = None
+        self.rows = []
+        self.loaded = 0
+
+    def set_rows(self, table, rows):
+        self.beginResetModel()
+        self.table = table
+        self.rows = rows
+        self.loaded = min(len(rows), self.BATCH_SIZE)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        # Only expose what has been fetched; the view asks for more on scroll
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(len(self.rows) - self.loaded, self.BATCH_SIZE)
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row = self.rows[index.row()]
+        return f"{self.table.filename(row)} ({self.table.date(row)})"
+
+    def table_row(self, index):
+        return int(self.rows[index.row()])
 
 # ----------------------------
 # Filings Viewer Tab
@@ -119,8 +151,11 @@ class FilingsViewerTab(QWidget):
         self.splitter = QSplitter(Qt.Orientation.Horizontal)
 
         # Left: filings list
-        self.list_widget = QListWidget()
-        self.list_widget.itemSelectionChanged.connect(self.show_details)
+        self.list_model = FilingsListModel()
+        self.list_widget = QListView()
+        self.list_widget.setUniformItemSizes(True)
+        self.list_widget.setModel(self.list_model)
+        self.list_widget.selectionModel().selectionChanged.connect(lambda *_: self.show_details())
         self.splitter.addWidget(self.list_widget)
 
         # Right: details panel
@@ -163,10 +198,13 @@ class FilingsViewerTab(QWidget):
     # ------------------------
     # Reload filings & labels
     # ------------------------
-    def reload_filings(self):
-        global filings
-        filings = load_filings()
-        self.labels = sorted({f.get("label") or "Unlabeled" for f in filings})
+    def reload_filings(self, table=None):
+        global filings_table
+        if table is not None:
+            filings_table = table
+        self.labels = sorted(filings_table.labels)
+        if len(filings_table.filter(label=UNLABELED)):
+            self.labels = sorted(self.labels + [UNLABELED])
         if hasattr(self, 'label_dropdown'):
             self.label_dropdown.clear()
             self.label_dropdown.addItem("All")
@@ -178,50 +216,47 @@ class FilingsViewerTab(QWidget):
     # Update list based on filter
     # ------------------------
     def update_list(self):
-        self.list_widget.clear()
         selected_label = self.label_dropdown.currentText()
-        for f in filings:
-            if selected_label == "All" or f.get("label") == selected_label:
-                display_name = f"{f['filename']} ({f.get('date','')})"
-                self.list_widget.addItem(display_name)
+        rows = filings_table.filter(label=None if selected_label == "All" else selected_label)
+        self.list_model.set_rows(filings_table, filings_table.sort(rows, by="date", descending=True))
 
     # ------------------------
     # Show selected filing details
     # ------------------------
     def show_details(self):
         self.summary_box.clear()
-        selected_items = self.list_widget.selectedItems()
-        if selected_items:
-            filename = selected_items[0].text().split(" (")[0]
-            for f in filings:
-                if f["filename"] == filename:
-                    # --- Update issuer & reporting ---
-                    issuer_name = f.get("issuer") or "—"
-                    reporting_persons = f.get("reporting_persons") or []
-                    self.issuer_label.setText(f"Issuer: {issuer_name}")
-                    self.reporting_label.setText("Reporting: " + ", ".join(reporting_persons))
-
-                    # --- Update detail labels ---
-                    self.date_label.setText(f"<b>Date:</b> {f.get('date','')}")
-                    self.form_label.setText(f"<b>Form:</b> {f.get('form','')}")
-                    self.cik_label.setText(f"<b>CIK:</b> {f.get('cik','')}")
-                    share_pct = f.get("share %")
-                    self.share_label.setText(
-                        f"<b>Share %:</b> {share_pct:.2%}" if share_pct else ""
-                    )
-
-                    # --- Update summary ---
-                    self.summary_box.setText(f.get("summary", "No summary available."))
-                    break
+        selected = self.list_widget.selectionModel().selectedIndexes()
+        if selected:
+            row = self.list_model.table_row(selected[0])
+            f = filings_table.record(row)
+
+            # --- Update issuer & reporting ---
+            issuer_name = f.get("issuer") or "—"
+            reporting_persons = f.get("reporting_persons") or []
+            self.issuer_label.setText(f"Issuer: {issuer_name}")
+            self.reporting_label.setText("Reporting: " + ", ".join(reporting_persons))
+
+            # --- Update detail labels ---
+            self.date_label.setText(f"<b>Date:</b> {f.get('date','')}")
+            self.form_label.setText(f"<b>Form:</b> {f.get('form') or ''}")
+            self.cik_label.setText(f"<b>CIK:</b> {f.get('cik') or ''}")
+            share_pct = f.get("share %")
+            self.share_label.setText(
+                f"<b>Share %:</b> {share_pct:.2%}" if share_pct else ""
+            )
+
+            # --- Update summary (loaded on demand from the meta file) ---
+            self.summary_box.setText(filings_table.summary(row) or "No summary available.")
 
 
 # ----------------------------
 # Control Panel Tab
 # ----------------------------
 class ControlPanelTab(QWidget):
-    def __init__(self, viewer_tab: FilingsViewerTab):
+    def __init__(self, viewer_tab: FilingsViewerTab, ownership_tab=None):
         super().__init__()
         self.viewer_tab = viewer_tab
+        self.ownership_tab = ownership_tab
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
 
@@ -264,13 +299,92 @@ class ControlPanelTab(QWidget):
         self.worker.error_signal.connect(self.on_error)
         self.worker.start()
 
-    def on_success(self, msg):
+    def on_success(self, msg, table, index):
         self.console.append(msg)
-        self.viewer_tab.reload_filings()
+        self.viewer_tab.reload_filings(table)
+        if self.ownership_tab is not None:
+            self.ownership_tab.reload_index(index)
 
     def on_error(self, msg):
         self.console.append("Error:\n" + msg)
 
+# ----------------------------
+# Ownership Tab
+# ----------------------------
+class OwnershipTab(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+        self.index = update_ownership_index()
+
+        # Query bar: issuer CIK or reporting person name
+        query_layout = QHBoxLayout()
+        self.mode_dropdown = QComboBox()
+        self.mode_dropdown.addItems(["Issuer CIK", "Reporting Person"])
+        self.query_field = QLineEdit()
+        self.query_field.setPlaceholderText("e.g. 0001610853 or Pantera Capital Partners LP")
+        self.query_field.returnPressed.connect(self.run_query)
+        self.min_share_spin = QSpinBox()
+        self.min_share_spin.setRange(0, 100)
+        self.min_share_spin.setSuffix(" %")
+        self.search_button = QPushButton("Search")
+        self.search_button.clicked.connect(self.run_query)
+        query_layout.addWidget(self.mode_dropdown)
+        query_layout.addWidget(self.query_field, stretch=1)
+        query_layout.addWidget(QLabel("<b>Min share:</b>"))
+        query_layout.addWidget(self.min_share_spin)
+        query_layout.addWidget(self.search_button)
+        self.layout.addLayout(query_layout)
+
+        self.results_box = QTextEdit()
+        self.results_box.setReadOnly(True)
+        self.results_box.setFont(QFont("Consolas", 10))
+        self.layout.addWidget(QLabel("<b>Stake history:</b>"))
+        self.layout.addWidget(self.results_box, stretch=1)
+
+    def reload_index(self, index=None):
+        self.index = index if index is not None else update_ownership_index()
+
+    def run_query(self):
+        self.results_box.clear()
+        text = self.query_field.text().strip()
+        if not text:
+            return
+        min_share = self.min_share_spin.value() / 100 or None
+
+        if self.mode_dropdown.currentText() == "Issuer CIK":
+            records = self.index.holders(text, min_share)
+        else:
+            records = self.index.stakes(text, min_share)
+            if not records:
+                matches = self.index.find_persons(text)
+                if matches:
+                    self.results_box.append("No exact match. Did you mean:")
+                    for name in matches[:20]:
+                        self.results_box.append(f"  {name}")
+                    return
+
+            # Issuers this person reached the threshold in
+            issuers = self.index.issuers_for(text, min_share)
+            if issuers:
+                threshold = f" at or above {min_share:.0%}" if min_share else ""
+                self.results_box.append(f"<b>Issuers{threshold} ({len(issuers)}):</b>")
+                for cik, issuer in issuers.items():
+                    self.results_box.append(f"  {issuer or '—'} (CIK {cik or '—'})")
+                self.results_box.append("")
+
+        if not records:
+            self.results_box.append("No filings found.")
+            return
+        for r in records:
+            share_pct = r.get("share %")
+            share_text = f"{share_pct:.2%}" if share_pct else "—"
+            self.results_box.append(
+                f"{r['date']}  {r.get('form') or ''}  {r.get('issuer') or '—'} (CIK {r.get('cik') or '—'})  "
+                f"share: {share_text}\n    Reporting: {', '.join(r['reporting_persons'])}"
+            )
+
 # ----------------------------
 # Chat Tab
 # ----------------------------
@@ -315,8 +429,10 @@ class MainApp(QWidget):
         self.setLayout(self.layout)
         self.tabs = QTabWidget()
         self.viewer_tab = FilingsViewerTab()
-        self.control_tab = ControlPanelTab(self.viewer_tab)
+        self.ownership_tab = OwnershipTab()
+        self.control_tab = ControlPanelTab(self.viewer_tab, self.ownership_tab)
         self.tabs.addTab(self.viewer_tab, "Filings Viewer")
+        self.tabs.addTab(self.ownership_tab, "Ownership")
         self.tabs.addTab(self.control_tab, "Control Panel")
         self.tabs.addTab(ChatTab(), "AI Chat")
         self.layout.addWidget(self.tabs)